@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Asynchronous ONVIF Client for IP Cameras
+An asyncio variant of ONVIFClient for querying many cameras concurrently
+"""
+
+import asyncio
+import datetime
+import logging
+import os
+import threading
+from typing import Optional, List, Dict, Any, Tuple
+import httpx
+import onvif
+from onvif.definition import SERVICES
+from zeep import AsyncClient, Settings
+from zeep.cache import SqliteCache
+from zeep.exceptions import Fault
+from zeep.proxy import AsyncServiceProxy
+from zeep.transports import AsyncTransport, Transport
+from zeep.wsdl import Document
+from zeep.wsse.username import UsernameToken
+from onvif_client import WSDL_CACHE_TIMEOUT, _CAP_FIELDS
+
+
+# WSDL files bundled with the onvif-zeep package (same as ONVIFCamera's default)
+WSDL_DIR = os.path.join(os.path.dirname(os.path.dirname(onvif.__file__)), 'wsdl')
+
+logger = logging.getLogger(__name__)
+
+# Lenient parsing like onvif-zeep's ONVIFService: real cameras often send
+# responses that don't strictly match the ONVIF schemas
+_SETTINGS = Settings(strict=False, xml_huge_tree=True)
+
+# Parsed WSDL documents keyed by service name, shared by every client in
+# the process so each WSDL is only parsed once
+_wsdl_documents: Dict[str, Document] = {}
+_wsdl_lock = threading.Lock()
+
+
+def _load_wsdl(name: str) -> Document:
+    """
+    Parse the WSDL of an ONVIF service once per process
+    
+    Args:
+        name: Service name as defined by onvif-zeep, e.g. 'media'
+    
+    Returns:
+        Document: Parsed WSDL document
+    """
+    with _wsdl_lock:
+        document = _wsdl_documents.get(name)
+        if document is None:
+            cache = SqliteCache(
+                path=os.getenv('ONVIF_WSDL_CACHE'),
+                timeout=WSDL_CACHE_TIMEOUT
+            )
+            document = Document(
+                os.path.join(WSDL_DIR, SERVICES[name]['wsdl']),
+                Transport(cache=cache),
+                settings=_SETTINGS
+            )
+            _wsdl_documents[name] = document
+        return document
+
+
+async def _get_wsdl(name: str) -> Document:
+    """Get a parsed WSDL document, parsing it off the event loop if needed"""
+    document = _wsdl_documents.get(name)
+    if document is None:
+        # WSDL parsing is synchronous, keep it off the event loop
+        document = await asyncio.to_thread(_load_wsdl, name)
+    return document
+
+
+class AsyncONVIFClient:
+    """Asynchronous ONVIF Client for IP Camera operations"""
+    
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 transport: Optional[AsyncTransport] = None):
+        """
+        Initialize asynchronous ONVIF client
+        
+        Args:
+            host: IP address or hostname of the camera
+            port: ONVIF service port (usually 80, 8080, or 8000)
+            username: Camera username
+            password: Camera password
+            transport: Transport shared with other clients. If None, the
+                       client creates (and closes) its own.
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.media_service = None
+        self.ptz_service = None
+        self.device_service = None
+        self._profiles_cache = None
+        self._transport = transport
+        self._owns_transport = transport is None
+        
+        # Setup logging
+        self.logger = logger
+    
+    async def _create_service(self, name: str, xaddr: str):
+        """
+        Create an async SOAP proxy for an ONVIF service
+        
+        Args:
+            name: Service name as defined by onvif-zeep, e.g. 'media'
+            xaddr: Service endpoint address on the camera
+        
+        Returns:
+            Async service proxy
+        """
+        definition = SERVICES[name]
+        client = AsyncClient(
+            wsdl=await _get_wsdl(name),
+            wsse=UsernameToken(self.username, self.password, use_digest=True),
+            transport=self._transport,
+            settings=_SETTINGS
+        )
+        binding_name = '{%s}%s' % (definition['ns'], definition['binding'])
+        # AsyncClient.create_service() returns a sync proxy, so bind manually
+        binding = client.wsdl.bindings[binding_name]
+        return AsyncServiceProxy(client, binding, address=xaddr)
+    
+    async def connect(self) -> bool:
+        """
+        Connect to the ONVIF camera
+        
+        Returns:
+            bool: True if connection successful, False otherwise
+        """
+        try:
+            self.logger.info("Connecting to camera at %s:%s", self.host, self.port)
+            
+            if self._transport is None:
+                self._transport = AsyncTransport(client=httpx.AsyncClient())
+            
+            xaddr = 'http://%s:%s/onvif/device_service' % (self.host, self.port)
+            self.device_service = await self._create_service('devicemgmt', xaddr)
+            capabilities = await self.device_service.GetCapabilities(Category='All')
+            
+            self.media_service = await self._create_service('media', capabilities.Media.XAddr)
+            
+            # PTZ service may not be available on all cameras
+            if capabilities.PTZ is not None:
+                try:
+                    self.ptz_service = await self._create_service('ptz', capabilities.PTZ.XAddr)
+                except Exception as e:
+                    self.logger.warning("PTZ service not available: %s", e)
+                    self.ptz_service = None
+            else:
+                self.logger.warning("PTZ service not advertised by device")
+                self.ptz_service = None
+            
+            self.logger.info("Successfully connected to camera")
+            return True
+        
+        except Exception as e:
+            self.logger.error("Failed to connect to camera: %s", e)
+            return False
+    
+    async def close(self):
+        """Close the HTTP clients this client created (a shared transport is left open)"""
+        if self._transport is not None and self._owns_transport:
+            await self._transport.aclose()
+            self._transport.wsdl_client.close()
+            self._transport = None
+    
+    async def bootstrap(self) -> Dict[str, Any]:
+        """
+        Fetch all camera metadata using concurrent SOAP requests
+        
+        Returns:
+            dict: Results keyed by 'device_information', 'capabilities',
+                  'profiles', 'stream_uri' and 'snapshot_uri' (None on failure)
+        """
+        device_info, capabilities, profiles = await asyncio.gather(
+            self.get_device_information(),
+            self.get_capabilities(),
+            self.get_profiles()
+        )
+        results = {
+            'device_information': device_info,
+            'capabilities': capabilities,
+            'profiles': profiles,
+            'stream_uri': None,
+            'snapshot_uri': None
+        }
+        
+        # Stream and snapshot URIs depend on the profile token
+        if profiles:
+            profile_token = profiles[0].token
+            results['stream_uri'], results['snapshot_uri'] = await asyncio.gather(
+                self.get_stream_uri(profile_token),
+                self.get_snapshot_uri(profile_token)
+            )
+        
+        return results
+    
+    async def get_device_information(self) -> Optional[Dict[str, Any]]:
+        """
+        Get device information from the camera
+        
+        Returns:
+            dict: Device information including manufacturer, model, firmware version, etc.
+        """
+        try:
+            if not self.device_service:
+                self.logger.error("Device service not initialized")
+                return None
+            
+            info = await self.device_service.GetDeviceInformation()
+            
+            device_info = {
+                'Manufacturer': info.Manufacturer,
+                'Model': info.Model,
+                'FirmwareVersion': info.FirmwareVersion,
+                'SerialNumber': info.SerialNumber,
+                'HardwareId': info.HardwareId
+            }
+            
+            self.logger.info("Device info retrieved: %s %s",
+                             device_info['Manufacturer'], device_info['Model'])
+            return device_info
+        
+        except Fault as e:
+            self.logger.error("SOAP Fault while getting device info: %s", e)
+            return None
+        except Exception as e:
+            self.logger.error("Error getting device information: %s", e)
+            return None
+    
+    async def get_profiles(self) -> Optional[List[Any]]:
+        """
+        Get media profiles from the camera
+        
+        Returns:
+            list: List of media profiles
+        """
+        try:
+            if not self.media_service:
+                self.logger.error("Media service not initialized")
+                return None
+            
+            profiles = await self.media_service.GetProfiles()
+            self._profiles_cache = profiles or None
+            self.logger.info("Retrieved %s media profiles", len(profiles))
+            return profiles
+        
+        except Fault as e:
+            self.logger.error("SOAP Fault while getting profiles: %s", e)
+            return None
+        except Exception as e:
+            self.logger.error("Error getting profiles: %s", e)
+            return None
+    
+    async def _default_profile_token(self) -> Optional[str]:
+        """
+        Get the token of the first media profile, fetching profiles only once
+        
+        Returns:
+            str: Token of the first profile, or None if the camera has none
+        """
+        if self._profiles_cache is None:
+            profiles = await self.media_service.GetProfiles()
+            if not profiles:
+                return None
+            self._profiles_cache = profiles
+        return self._profiles_cache[0].token
+    
+    def invalidate_profiles(self):
+        """Drop cached media profiles, e.g. after reconfiguring the camera"""
+        self._profiles_cache = None
+    
+    async def get_stream_uri(self, profile_token: Optional[str] = None) -> Optional[str]:
+        """
+        Get the RTSP stream URI for a profile
+        
+        Args:
+            profile_token: Token of the profile to get stream URI for.
+                          If None, uses the first available profile.
+        
+        Returns:
+            str: RTSP stream URI
+        """
+        try:
+            if not self.media_service:
+                self.logger.error("Media service not initialized")
+                return None
+            
+            # If no profile token provided, use the first (cached) profile
+            profile_token = profile_token or await self._default_profile_token()
+            if not profile_token:
+                self.logger.error("No profiles available")
+                return None
+            
+            stream_uri = await self.media_service.GetStreamUri(
+                ProfileToken=profile_token,
+                StreamSetup={
+                    'Stream': 'RTP-Unicast',
+                    'Transport': {'Protocol': 'RTSP'}
+                }
+            )
+            uri = stream_uri.Uri
+            
+            self.logger.info("Stream URI retrieved: %s", uri)
+            return uri
+        
+        except Fault as e:
+            self.logger.error("SOAP Fault while getting stream URI: %s", e)
+            return None
+        except Exception as e:
+            self.logger.error("Error getting stream URI: %s", e)
+            return None
+    
+    async def get_snapshot_uri(self, profile_token: Optional[str] = None) -> Optional[str]:
+        """
+        Get the snapshot URI for a profile
+        
+        Args:
+            profile_token: Token of the profile to get snapshot URI for.
+                          If None, uses the first available profile.
+        
+        Returns:
+            str: Snapshot URI
+        """
+        try:
+            if not self.media_service:
+                self.logger.error("Media service not initialized")
+                return None
+            
+            # If no profile token provided, use the first (cached) profile
+            profile_token = profile_token or await self._default_profile_token()
+            if not profile_token:
+                self.logger.error("No profiles available")
+                return None
+            
+            snapshot_uri = await self.media_service.GetSnapshotUri(ProfileToken=profile_token)
+            uri = snapshot_uri.Uri
+            
+            self.logger.info("Snapshot URI retrieved: %s", uri)
+            return uri
+        
+        except Fault as e:
+            self.logger.error("SOAP Fault while getting snapshot URI: %s", e)
+            return None
+        except Exception as e:
+            self.logger.error("Error getting snapshot URI: %s", e)
+            return None
+    
+    async def move_ptz(self, pan: float, tilt: float, zoom: float,
+                       profile_token: Optional[str] = None,
+                       duration_s: Optional[float] = None) -> bool:
+        """
+        Move PTZ (Pan-Tilt-Zoom) camera
+        
+        Args:
+            pan: Pan value (-1.0 to 1.0, negative is left, positive is right)
+            tilt: Tilt value (-1.0 to 1.0, negative is down, positive is up)
+            zoom: Zoom value (-1.0 to 1.0, negative is zoom out, positive is zoom in)
+            profile_token: Profile token to use. If None, uses the first available profile.
+            duration_s: If set, the camera stops the move by itself after this
+                        many seconds, so no stop_ptz() call is needed.
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            if not self.ptz_service:
+                self.logger.error("PTZ service not available")
+                return False
+            
+            # If no profile token provided, use the first (cached) profile
+            profile_token = profile_token or await self._default_profile_token()
+            if not profile_token:
+                self.logger.error("No profiles available")
+                return False
+            
+            # zeep serializes a timedelta as an ISO-8601 duration
+            timeout = None
+            if duration_s is not None:
+                if duration_s <= 0:
+                    self.logger.error("Invalid PTZ move duration: %s", duration_s)
+                    return False
+                timeout = datetime.timedelta(seconds=duration_s)
+            
+            await self.ptz_service.ContinuousMove(
+                ProfileToken=profile_token,
+                Velocity={
+                    'PanTilt': {'x': pan, 'y': tilt},
+                    'Zoom': {'x': zoom}
+                },
+                Timeout=timeout
+            )
+            self.logger.info("PTZ moved: pan=%s, tilt=%s, zoom=%s", pan, tilt, zoom)
+            return True
+        
+        except Fault as e:
+            self.logger.error("SOAP Fault while moving PTZ: %s", e)
+            return False
+        except Exception as e:
+            self.logger.error("Error moving PTZ: %s", e)
+            return False
+    
+    async def stop_ptz(self, profile_token: Optional[str] = None) -> bool:
+        """
+        Stop PTZ movement
+        
+        Args:
+            profile_token: Profile token to use. If None, uses the first available profile.
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            if not self.ptz_service:
+                self.logger.error("PTZ service not available")
+                return False
+            
+            # If no profile token provided, use the first (cached) profile
+            profile_token = profile_token or await self._default_profile_token()
+            if not profile_token:
+                self.logger.error("No profiles available")
+                return False
+            
+            await self.ptz_service.Stop(ProfileToken=profile_token, PanTilt=True, Zoom=True)
+            self.logger.info("PTZ stopped")
+            return True
+        
+        except Fault as e:
+            self.logger.error("SOAP Fault while stopping PTZ: %s", e)
+            return False
+        except Exception as e:
+            self.logger.error("Error stopping PTZ: %s", e)
+            return False
+    
+    async def get_capabilities(self) -> Optional[Dict[str, Any]]:
+        """
+        Get device capabilities
+        
+        Returns:
+            dict: Device capabilities
+        """
+        try:
+            if not self.device_service:
+                self.logger.error("Device service not initialized")
+                return None
+            
+            capabilities = await self.device_service.GetCapabilities()
+            
+            caps_dict = {f: getattr(capabilities, f, None) is not None for f in _CAP_FIELDS}
+            
+            self.logger.info("Device capabilities retrieved: %s", caps_dict)
+            return caps_dict
+        
+        except Fault as e:
+            self.logger.error("SOAP Fault while getting capabilities: %s", e)
+            return None
+        except Exception as e:
+            self.logger.error("Error getting capabilities: %s", e)
+            return None
+    
+    async def get_services_capabilities(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Get all service endpoints and their capabilities in one request
+        
+        Returns:
+            dict: Service info keyed by namespace, each with 'XAddr' and
+                  'Capabilities' entries
+        """
+        try:
+            if not self.device_service:
+                self.logger.error("Device service not initialized")
+                return None
+            
+            services = await self.device_service.GetServices(IncludeCapability=True)
+            
+            services_dict = {
+                service.Namespace: {
+                    'XAddr': service.XAddr,
+                    'Capabilities': service.Capabilities
+                }
+                for service in services
+            }
+            
+            self.logger.info("Retrieved %s device services", len(services_dict))
+            return services_dict
+            
+        except Fault as e:
+            self.logger.error("SOAP Fault while getting services: %s", e)
+            return None
+        except Exception as e:
+            self.logger.error("Error getting services: %s", e)
+            return None
+
+
+async def bootstrap_many(hosts: List[Tuple[str, int, str, str]]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Connect to several cameras concurrently and fetch their metadata
+    
+    Args:
+        hosts: List of (host, port, username, password) tuples
+    
+    Returns:
+        list: bootstrap() results in the same order as hosts
+              (None for cameras that could not be connected)
+    """
+    # One keep-alive pool for all cameras
+    transport = AsyncTransport(client=httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=32)
+    ))
+    
+    async def _bootstrap_one(host, port, username, password):
+        client = AsyncONVIFClient(host, port, username, password, transport=transport)
+        if not await client.connect():
+            return None
+        return await client.bootstrap()
+    
+    try:
+        return await asyncio.gather(*(_bootstrap_one(*host) for host in hosts))
+    finally:
+        await transport.aclose()
+        transport.wsdl_client.close()
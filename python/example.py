@@ -4,20 +4,32 @@ Example usage of ONVIF Client for IP Cameras
 This script demonstrates how to use the ONVIF client to interact with an IP camera
 """
 
+import functools
 import sys
 import time
 import os
+import logging
 from configparser import ConfigParser
 from onvif_client import ONVIFClient, setup_logging
 
 
-def load_config():
-    """
-    Load camera configuration from config.ini file or environment variables
-    
-    Returns:
-        dict: Configuration dictionary with camera settings
-    """
+# Output dividers
+_HEADER = "=" * 60
+_DIVIDER = "-" * 60
+
+# Environment fallbacks as (config key, environment variable, default)
+_ENV_DEFAULTS = (
+    ('host', 'ONVIF_HOST', '192.168.1.100'),
+    ('port', 'ONVIF_PORT', '80'),
+    ('username', 'ONVIF_USERNAME', 'admin'),
+    ('password', 'ONVIF_PASSWORD', 'password'),
+    ('log_level', 'LOG_LEVEL', 'INFO')
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config_impl():
+    """Read config.ini and the environment once; see load_config()"""
     config = {}
     
     # Try to load from config file first
@@ -35,43 +47,60 @@ def load_config():
             if parser.has_section('settings'):
                 log_level = parser.get('settings', 'log_level', fallback='INFO')
                 config['log_level'] = log_level
-            return config
     
-    # Fall back to environment variables
-    config['host'] = os.getenv('ONVIF_HOST', '192.168.1.100')
-    config['port'] = int(os.getenv('ONVIF_PORT', '80'))
-    config['username'] = os.getenv('ONVIF_USERNAME', 'admin')
-    config['password'] = os.getenv('ONVIF_PASSWORD', 'password')
-    config['log_level'] = os.getenv('LOG_LEVEL', 'INFO')
+    # Fall back to environment variables for anything not in the file
+    for key, envvar, default in _ENV_DEFAULTS:
+        config.setdefault(key, os.environ.get(envvar, default))
+    config['port'] = int(config['port'])
     
     return config
 
 
+def load_config():
+    """
+    Load camera configuration from config.ini file or environment variables
+    
+    The configuration is only read once per process; call reload_config()
+    to pick up changes.
+    
+    Returns:
+        dict: Configuration dictionary with camera settings
+    """
+    return dict(_load_config_impl())
+
+
+def reload_config():
+    """Forget the cached configuration so the next load_config() re-reads it"""
+    _load_config_impl.cache_clear()
+
+
+def _section(title):
+    """Start the output lines of a section with its title between dividers"""
+    return [_DIVIDER, title, _DIVIDER]
+
+
+def _write(lines):
+    """Write a block of output lines to stdout in a single call"""
+    sys.stdout.write('\n'.join(lines) + '\n')
+    sys.stdout.flush()
+
+
 def main():
     """Main example function"""
     
     # Load configuration
     config = load_config()
     
-    # Setup logging
-    import logging
-    log_levels = {
-        'DEBUG': logging.DEBUG,
-        'INFO': logging.INFO,
-        'WARNING': logging.WARNING,
-        'ERROR': logging.ERROR,
-        'CRITICAL': logging.CRITICAL
-    }
-    log_level = log_levels.get(config.get('log_level', 'INFO'), logging.INFO)
+    # Setup logging (getLevelName maps standard names to their numeric level)
+    log_level = logging.getLevelName(config.get('log_level', 'INFO').upper())
+    if not isinstance(log_level, int):
+        log_level = logging.INFO
     setup_logging(level=log_level)
     
-    print("=" * 60)
-    print("ONVIF Camera Client Example")
-    print("=" * 60)
-    print()
+    _write([_HEADER, "ONVIF Camera Client Example", _HEADER, ""])
     
     # Create ONVIF client instance
-    print(f"Connecting to camera at {config['host']}:{config['port']}...")
+    _write([f"Connecting to camera at {config['host']}:{config['port']}..."])
     client = ONVIFClient(
         config['host'],
         config['port'],
@@ -81,125 +110,98 @@ def main():
     
     # Connect to the camera
     if not client.connect():
-        print("Failed to connect to camera. Please check your credentials and network connection.")
+        _write(["Failed to connect to camera. Please check your credentials and network connection."])
         sys.exit(1)
     
-    print("✓ Successfully connected to camera")
-    print()
+    _write(["✓ Successfully connected to camera", ""])
+    
+    # Fetch all camera metadata in one concurrent batch
+    results = client.bootstrap()
     
-    # Get device information
-    print("-" * 60)
-    print("Device Information:")
-    print("-" * 60)
-    device_info = client.get_device_information()
+    # Device information
+    lines = _section("Device Information:")
+    device_info = results['device_information']
     if device_info:
         for key, value in device_info.items():
-            print(f"  {key}: {value}")
+            lines.append(f"  {key}: {value}")
     else:
-        print("  Failed to retrieve device information")
-    print()
-    
-    # Get device capabilities
-    print("-" * 60)
-    print("Device Capabilities:")
-    print("-" * 60)
-    capabilities = client.get_capabilities()
+        lines.append("  Failed to retrieve device information")
+    lines.append("")
+    
+    # Device capabilities
+    lines += _section("Device Capabilities:")
+    capabilities = results['capabilities']
     if capabilities:
         for key, value in capabilities.items():
             status = "✓ Supported" if value else "✗ Not supported"
-            print(f"  {key}: {status}")
+            lines.append(f"  {key}: {status}")
     else:
-        print("  Failed to retrieve capabilities")
-    print()
-    
-    # Get media profiles
-    print("-" * 60)
-    print("Media Profiles:")
-    print("-" * 60)
-    profiles = client.get_profiles()
+        lines.append("  Failed to retrieve capabilities")
+    lines.append("")
+    
+    # Media profiles
+    lines += _section("Media Profiles:")
+    profiles = results['profiles']
     if profiles:
         for i, profile in enumerate(profiles):
-            print(f"  Profile {i + 1}:")
-            print(f"    Token: {profile.token}")
-            print(f"    Name: {profile.Name}")
+            lines.append(f"  Profile {i + 1}:")
+            lines.append(f"    Token: {profile.token}")
+            lines.append(f"    Name: {profile.Name}")
             if hasattr(profile, 'VideoEncoderConfiguration') and profile.VideoEncoderConfiguration:
                 video_config = profile.VideoEncoderConfiguration
-                print(f"    Video Encoding: {video_config.Encoding}")
-                print(f"    Resolution: {video_config.Resolution.Width}x{video_config.Resolution.Height}")
-                print(f"    Frame Rate: {video_config.RateControl.FrameRateLimit}")
-            print()
+                lines.append(f"    Video Encoding: {video_config.Encoding}")
+                lines.append(f"    Resolution: {video_config.Resolution.Width}x{video_config.Resolution.Height}")
+                lines.append(f"    Frame Rate: {video_config.RateControl.FrameRateLimit}")
+            lines.append("")
     else:
-        print("  Failed to retrieve media profiles")
+        lines.append("  Failed to retrieve media profiles")
     
-    # Get stream URI
-    print("-" * 60)
-    print("Stream URI:")
-    print("-" * 60)
-    stream_uri = client.get_stream_uri()
+    # Stream URI
+    lines += _section("Stream URI:")
+    stream_uri = results['stream_uri']
     if stream_uri:
-        print(f"  RTSP Stream: {stream_uri}")
+        lines.append(f"  RTSP Stream: {stream_uri}")
     else:
-        print("  Failed to retrieve stream URI")
-    print()
-    
-    # Get snapshot URI
-    print("-" * 60)
-    print("Snapshot URI:")
-    print("-" * 60)
-    snapshot_uri = client.get_snapshot_uri()
+        lines.append("  Failed to retrieve stream URI")
+    lines.append("")
+    
+    # Snapshot URI
+    lines += _section("Snapshot URI:")
+    snapshot_uri = results['snapshot_uri']
     if snapshot_uri:
-        print(f"  Snapshot URL: {snapshot_uri}")
+        lines.append(f"  Snapshot URL: {snapshot_uri}")
     else:
-        print("  Failed to retrieve snapshot URI")
-    print()
+        lines.append("  Failed to retrieve snapshot URI")
+    lines.append("")
+    _write(lines)
     
     # PTZ demonstration (if supported)
     if capabilities and capabilities.get('PTZ', False):
-        print("-" * 60)
-        print("PTZ Control Demonstration:")
-        print("-" * 60)
-        print("  Demonstrating PTZ control...")
+        _write(_section("PTZ Control Demonstration:") + ["  Demonstrating PTZ control..."])
+        
+        # Each move is timed by the camera, which stops on its own; wait
+        # for it to finish before issuing the next one
         
         # Pan right
-        print("  → Moving right...")
-        client.move_ptz(pan=0.5, tilt=0.0, zoom=0.0)
+        _write(["  → Moving right..."])
+        client.move_ptz(pan=0.5, tilt=0.0, zoom=0.0, duration_s=2.0)
         time.sleep(2)
         
-        # Stop
-        print("  ■ Stopping...")
-        client.stop_ptz()
-        time.sleep(1)
-        
         # Pan left
-        print("  ← Moving left...")
-        client.move_ptz(pan=-0.5, tilt=0.0, zoom=0.0)
+        _write(["  ← Moving left..."])
+        client.move_ptz(pan=-0.5, tilt=0.0, zoom=0.0, duration_s=2.0)
         time.sleep(2)
         
-        # Stop
-        print("  ■ Stopping...")
-        client.stop_ptz()
-        time.sleep(1)
-        
         # Tilt up
-        print("  ↑ Moving up...")
-        client.move_ptz(pan=0.0, tilt=0.5, zoom=0.0)
+        _write(["  ↑ Moving up..."])
+        client.move_ptz(pan=0.0, tilt=0.5, zoom=0.0, duration_s=2.0)
         time.sleep(2)
         
-        # Stop
-        print("  ■ Stopping...")
-        client.stop_ptz()
-        
-        print("  ✓ PTZ demonstration complete")
+        _write(["  ✓ PTZ demonstration complete"])
     else:
-        print("-" * 60)
-        print("PTZ Control:")
-        print("-" * 60)
-        print("  PTZ not supported by this camera")
-    
-    print()
-    print("=" * 60)
-    print("Example completed successfully!")
-    print("=" * 60)
+        _write(_section("PTZ Control:") + ["  PTZ not supported by this camera"])
+    
+    _write(["", _HEADER, "Example completed successfully!", _HEADER])
 
 
 if __name__ == '__main__':
@@ -4,15 +4,154 @@ ONVIF Client for IP Cameras
 A basic implementation of an ONVIF client to interact with IP cameras
 """
 
+import datetime
+import functools
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Dict, Any
-from onvif import ONVIFCamera
-from zeep.exceptions import Fault
+
+
+# zeep's SqliteCache only stores documents fetched over http(s); the WSDL/XSD
+# files bundled with onvif-zeep are read from disk and parsed on every load.
+# The cache lives in zeep's per-user default location unless the
+# ONVIF_WSDL_CACHE environment variable points elsewhere.
+WSDL_CACHE_TIMEOUT = 86400
+
+logger = logging.getLogger(__name__)
+
+# Capability categories reported by get_capabilities()
+_CAP_FIELDS = ('Analytics', 'Device', 'Events', 'Imaging', 'Media', 'PTZ')
+
+# Marks a PTZ service that was probed and found unavailable
+_UNAVAILABLE = object()
+
+
+def _once(method):
+    """
+    Memoize a getter per client instance
+    
+    The first non-None result is stored in self._cache and reused by
+    later calls until refresh() is called. Callers get a shallow copy, so
+    mutating a returned dict does not change the cached one.
+    """
+    @functools.wraps(method)
+    def wrapper(self):
+        result = self._cache.get(method.__name__)
+        if result is None:
+            result = method(self)
+            if result is None:
+                return None
+            self._cache[method.__name__] = result
+        return dict(result)
+    return wrapper
+
+
+class _FaultNotLoaded(Exception):
+    """Stands in for zeep's Fault until the SOAP stack is imported"""
+
+
+# The onvif/zeep/requests stack is slow to import, so it is only loaded on
+# first connect() (see _load_dependencies)
+requests = None
+HTTPAdapter = None
+Retry = None
+ONVIFCamera = None
+SERVICES = None
+SqliteCache = None
+Transport = None
+Fault = _FaultNotLoaded
+
+
+def _load_dependencies():
+    """
+    Import the heavy SOAP dependencies into the module namespace
+    
+    Only names that are still placeholders are bound, so anything already
+    set (e.g. a test patch) is left alone.
+    """
+    global requests, HTTPAdapter, Retry, ONVIFCamera, SERVICES
+    global SqliteCache, Transport, Fault
+    
+    if requests is None:
+        import requests as _requests
+        requests = _requests
+    if HTTPAdapter is None:
+        from requests.adapters import HTTPAdapter as _HTTPAdapter
+        HTTPAdapter = _HTTPAdapter
+    if Retry is None:
+        from urllib3.util.retry import Retry as _Retry
+        Retry = _Retry
+    if ONVIFCamera is None:
+        from onvif import ONVIFCamera as _ONVIFCamera
+        ONVIFCamera = _ONVIFCamera
+    if SERVICES is None:
+        from onvif.definition import SERVICES as _SERVICES
+        SERVICES = _SERVICES
+    if SqliteCache is None:
+        from zeep.cache import SqliteCache as _SqliteCache
+        SqliteCache = _SqliteCache
+    if Transport is None:
+        from zeep.transports import Transport as _Transport
+        Transport = _Transport
+    if Fault is _FaultNotLoaded:
+        from zeep.exceptions import Fault as _Fault
+        Fault = _Fault
+
+
+class _SharedTransport:
+    """Process-wide zeep transport shared by all ONVIFClient instances"""
+    
+    _transport: Optional['Transport'] = None
+    _lock = threading.Lock()
+    
+    @classmethod
+    def get(cls) -> 'Transport':
+        """
+        Get the shared transport, creating it on first use
+        
+        Returns:
+            Transport: zeep transport with a pooled keep-alive session and
+                       a persistent WSDL cache
+        """
+        with cls._lock:
+            if cls._transport is None:
+                _load_dependencies()
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=64,
+                    pool_maxsize=64,
+                    max_retries=Retry(total=2, connect=2, backoff_factor=0.5)
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                cache = SqliteCache(
+                    path=os.getenv('ONVIF_WSDL_CACHE'),
+                    timeout=WSDL_CACHE_TIMEOUT
+                )
+                cls._transport = Transport(session=session, cache=cache)
+            return cls._transport
+    
+    @classmethod
+    def close(cls):
+        """Close the shared session, e.g. at process shutdown"""
+        with cls._lock:
+            if cls._transport is not None:
+                cls._transport.session.close()
+                cls._transport = None
 
 
 class ONVIFClient:
     """Basic ONVIF Client for IP Camera operations"""
     
+    # Fixed attribute layout keeps per-instance memory low in large fleets
+    __slots__ = (
+        'host', 'port', 'username', 'password', 'camera', 'logger',
+        '_device_service', '_media_service', '_ptz_service',
+        '_templates', '_cache', '_profiles_cache'
+    )
+    
     def __init__(self, host: str, port: int, username: str, password: str):
         """
         Initialize ONVIF client
@@ -27,13 +166,16 @@ class ONVIFClient:
         self.port = port
         self.username = username
         self.password = password
-        self.camera: Optional[ONVIFCamera] = None
-        self.media_service = None
-        self.ptz_service = None
-        self.device_service = None
+        self.camera: Optional['ONVIFCamera'] = None
+        self._device_service = None
+        self._media_service = None
+        self._ptz_service = None
+        self._templates: Dict[str, Any] = {}
+        self._cache: Dict[str, Any] = {}
+        self._profiles_cache = None
         
         # Setup logging
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
         
     def connect(self) -> bool:
         """
@@ -43,32 +185,148 @@ class ONVIFClient:
             bool: True if connection successful, False otherwise
         """
         try:
-            self.logger.info(f"Connecting to camera at {self.host}:{self.port}")
+            self.logger.info("Connecting to camera at %s:%s", self.host, self.port)
+            _load_dependencies()
+            
+            # All clients share one keep-alive HTTP session and WSDL cache
+            transport = _SharedTransport.get()
+            
             self.camera = ONVIFCamera(
                 self.host, 
                 self.port, 
                 self.username, 
-                self.password
+                self.password,
+                transport=transport
             )
             
-            # Initialize services
-            self.device_service = self.camera.create_devicemgmt_service()
-            self.media_service = self.camera.create_media_service()
-            
-            # Try to initialize PTZ service (may not be available on all cameras)
-            try:
-                self.ptz_service = self.camera.create_ptz_service()
-            except Exception as e:
-                self.logger.warning(f"PTZ service not available: {e}")
-                self.ptz_service = None
+            # Services are created lazily on first use
+            self._device_service = None
+            self._media_service = None
+            self._ptz_service = None
+            self._templates = {}
+            self.refresh()
             
             self.logger.info("Successfully connected to camera")
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to connect to camera: {e}")
+            self.logger.error("Failed to connect to camera: %s", e)
             return False
     
+    @property
+    def device_service(self):
+        """Device management service (reuses the one ONVIFCamera already built)"""
+        if self._device_service is None and self.camera is not None:
+            self._device_service = self.camera.devicemgmt
+        return self._device_service
+    
+    @device_service.setter
+    def device_service(self, service):
+        self._device_service = service
+    
+    @property
+    def media_service(self):
+        """Media service, created on first access"""
+        if self._media_service is None and self.camera is not None:
+            self._media_service = self.camera.create_media_service()
+        return self._media_service
+    
+    @media_service.setter
+    def media_service(self, service):
+        self._media_service = service
+        self._templates = {}
+    
+    @property
+    def ptz_service(self):
+        """PTZ service, created on first access (None if not available)"""
+        if self._ptz_service is None and self.camera is not None:
+            # Only initialize PTZ service if the device advertised it in the
+            # capabilities ONVIFCamera already fetched (not all cameras have PTZ)
+            if SERVICES['ptz']['ns'] not in self.camera.xaddrs:
+                self.logger.warning("PTZ service not advertised by device")
+                self._ptz_service = _UNAVAILABLE
+            else:
+                try:
+                    self._ptz_service = self.camera.create_ptz_service()
+                except Exception as e:
+                    self.logger.warning("PTZ service not available: %s", e)
+                    self._ptz_service = _UNAVAILABLE
+        if self._ptz_service is _UNAVAILABLE:
+            return None
+        return self._ptz_service
+    
+    @ptz_service.setter
+    def ptz_service(self, service):
+        self._ptz_service = service
+        self._templates = {}
+    
+    def close(self):
+        """
+        Disconnect from the camera and drop all per-camera state
+        
+        The shared HTTP session stays open for other clients; use
+        close_shared_transport() to release pooled connections.
+        """
+        self.camera = None
+        self._device_service = None
+        self._media_service = None
+        self._ptz_service = None
+        self._templates = {}
+        self.refresh()
+    
+    def _ensure_services(self):
+        """Create the device and media services before worker threads use them"""
+        _ = self.device_service
+        _ = self.media_service
+    
+    def _fetch_device_metadata(self) -> Dict[str, Any]:
+        """Query the device service for device information and capabilities"""
+        return {
+            'device_information': self.get_device_information(),
+            'capabilities': self.get_capabilities()
+        }
+    
+    def _fetch_media_metadata(self) -> Dict[str, Any]:
+        """Query the media service for profiles and first profile's URIs"""
+        results = {
+            'profiles': self.get_profiles(),
+            'stream_uri': None,
+            'snapshot_uri': None
+        }
+        
+        # Stream and snapshot URIs depend on the profile token
+        if results['profiles']:
+            profile_token = results['profiles'][0].token
+            results['stream_uri'] = self.get_stream_uri(profile_token)
+            results['snapshot_uri'] = self.get_snapshot_uri(profile_token)
+        
+        return results
+    
+    def bootstrap(self) -> Dict[str, Any]:
+        """
+        Fetch all camera metadata using concurrent SOAP requests
+        
+        Device and media service requests run in parallel over the shared
+        keep-alive session. Calls on the same service stay sequential, since
+        onvif-zeep's WS-Security token is not safe to apply from two threads
+        at once.
+        
+        Returns:
+            dict: Results keyed by 'device_information', 'capabilities',
+                  'profiles', 'stream_uri' and 'snapshot_uri' (None on failure)
+        """
+        self._ensure_services()
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            device_metadata = executor.submit(self._fetch_device_metadata)
+            media_metadata = executor.submit(self._fetch_media_metadata)
+            
+            results = device_metadata.result()
+            results.update(media_metadata.result())
+        
+        return results
+    
+    @_once
     def get_device_information(self) -> Optional[Dict[str, Any]]:
         """
         Get device information from the camera
@@ -91,14 +349,15 @@ class ONVIFClient:
                 'HardwareId': info.HardwareId
             }
             
-            self.logger.info(f"Device info retrieved: {device_info['Manufacturer']} {device_info['Model']}")
+            self.logger.info("Device info retrieved: %s %s",
+                             device_info['Manufacturer'], device_info['Model'])
             return device_info
             
         except Fault as e:
-            self.logger.error(f"SOAP Fault while getting device info: {e}")
+            self.logger.error("SOAP Fault while getting device info: %s", e)
             return None
         except Exception as e:
-            self.logger.error(f"Error getting device information: {e}")
+            self.logger.error("Error getting device information: %s", e)
             return None
     
     def get_profiles(self) -> Optional[List[Any]]:
@@ -114,16 +373,60 @@ class ONVIFClient:
                 return None
                 
             profiles = self.media_service.GetProfiles()
-            self.logger.info(f"Retrieved {len(profiles)} media profiles")
+            self._profiles_cache = profiles or None
+            self.logger.info("Retrieved %s media profiles", len(profiles))
             return profiles
             
         except Fault as e:
-            self.logger.error(f"SOAP Fault while getting profiles: {e}")
+            self.logger.error("SOAP Fault while getting profiles: %s", e)
             return None
         except Exception as e:
-            self.logger.error(f"Error getting profiles: {e}")
+            self.logger.error("Error getting profiles: %s", e)
             return None
     
+    def _default_profile_token(self) -> Optional[str]:
+        """
+        Get the token of the first media profile, fetching profiles only once
+        
+        Returns:
+            str: Token of the first profile, or None if the camera has none
+        """
+        if self._profiles_cache is None:
+            profiles = self.media_service.GetProfiles()
+            if not profiles:
+                return None
+            self._profiles_cache = profiles
+        return self._profiles_cache[0].token
+    
+    def _request_template(self, service, type_name: str):
+        """
+        Get a reusable request object, creating it only once per type
+        
+        The same object is returned on every call, so callers must set all
+        of its mutable fields before sending it.
+        
+        Args:
+            service: ONVIF service that defines the request type
+            type_name: Name of the request type, e.g. 'ContinuousMove'
+        
+        Returns:
+            Request object of the given type
+        """
+        template = self._templates.get(type_name)
+        if template is None:
+            template = service.create_type(type_name)
+            self._templates[type_name] = template
+        return template
+    
+    def invalidate_profiles(self):
+        """Drop cached media profiles, e.g. after reconfiguring the camera"""
+        self._profiles_cache = None
+    
+    def refresh(self):
+        """Drop all cached device metadata so the next calls query the camera"""
+        self._cache.clear()
+        self.invalidate_profiles()
+    
     def get_stream_uri(self, profile_token: Optional[str] = None) -> Optional[str]:
         """
         Get the RTSP stream URI for a profile
@@ -140,16 +443,14 @@ class ONVIFClient:
                 self.logger.error("Media service not initialized")
                 return None
             
-            # If no profile token provided, get the first profile
-            if profile_token is None:
-                profiles = self.get_profiles()
-                if not profiles:
-                    self.logger.error("No profiles available")
-                    return None
-                profile_token = profiles[0].token
+            # If no profile token provided, use the first (cached) profile
+            profile_token = profile_token or self._default_profile_token()
+            if not profile_token:
+                self.logger.error("No profiles available")
+                return None
             
             # Create stream setup
-            stream_setup = self.media_service.create_type('GetStreamUri')
+            stream_setup = self._request_template(self.media_service, 'GetStreamUri')
             stream_setup.ProfileToken = profile_token
             stream_setup.StreamSetup = {
                 'Stream': 'RTP-Unicast',
@@ -159,14 +460,14 @@ class ONVIFClient:
             stream_uri = self.media_service.GetStreamUri(stream_setup)
             uri = stream_uri.Uri
             
-            self.logger.info(f"Stream URI retrieved: {uri}")
+            self.logger.info("Stream URI retrieved: %s", uri)
             return uri
             
         except Fault as e:
-            self.logger.error(f"SOAP Fault while getting stream URI: {e}")
+            self.logger.error("SOAP Fault while getting stream URI: %s", e)
             return None
         except Exception as e:
-            self.logger.error(f"Error getting stream URI: {e}")
+            self.logger.error("Error getting stream URI: %s", e)
             return None
     
     def get_snapshot_uri(self, profile_token: Optional[str] = None) -> Optional[str]:
@@ -185,33 +486,32 @@ class ONVIFClient:
                 self.logger.error("Media service not initialized")
                 return None
             
-            # If no profile token provided, get the first profile
-            if profile_token is None:
-                profiles = self.get_profiles()
-                if not profiles:
-                    self.logger.error("No profiles available")
-                    return None
-                profile_token = profiles[0].token
+            # If no profile token provided, use the first (cached) profile
+            profile_token = profile_token or self._default_profile_token()
+            if not profile_token:
+                self.logger.error("No profiles available")
+                return None
             
             # Get snapshot URI
-            request = self.media_service.create_type('GetSnapshotUri')
+            request = self._request_template(self.media_service, 'GetSnapshotUri')
             request.ProfileToken = profile_token
             
             snapshot_uri = self.media_service.GetSnapshotUri(request)
             uri = snapshot_uri.Uri
             
-            self.logger.info(f"Snapshot URI retrieved: {uri}")
+            self.logger.info("Snapshot URI retrieved: %s", uri)
             return uri
             
         except Fault as e:
-            self.logger.error(f"SOAP Fault while getting snapshot URI: {e}")
+            self.logger.error("SOAP Fault while getting snapshot URI: %s", e)
             return None
         except Exception as e:
-            self.logger.error(f"Error getting snapshot URI: {e}")
+            self.logger.error("Error getting snapshot URI: %s", e)
             return None
     
     def move_ptz(self, pan: float, tilt: float, zoom: float, 
-                 profile_token: Optional[str] = None) -> bool:
+                 profile_token: Optional[str] = None,
+                 duration_s: Optional[float] = None) -> bool:
         """
         Move PTZ (Pan-Tilt-Zoom) camera
         
@@ -220,6 +520,8 @@ class ONVIFClient:
             tilt: Tilt value (-1.0 to 1.0, negative is down, positive is up)
             zoom: Zoom value (-1.0 to 1.0, negative is zoom out, positive is zoom in)
             profile_token: Profile token to use. If None, uses the first available profile.
+            duration_s: If set, the camera stops the move by itself after this
+                        many seconds, so no stop_ptz() call is needed.
         
         Returns:
             bool: True if successful, False otherwise
@@ -229,31 +531,38 @@ class ONVIFClient:
                 self.logger.error("PTZ service not available")
                 return False
             
-            # If no profile token provided, get the first profile
-            if profile_token is None:
-                profiles = self.get_profiles()
-                if not profiles:
-                    self.logger.error("No profiles available")
+            # If no profile token provided, use the first (cached) profile
+            profile_token = profile_token or self._default_profile_token()
+            if not profile_token:
+                self.logger.error("No profiles available")
+                return False
+            
+            # zeep serializes a timedelta as an ISO-8601 duration
+            timeout = None
+            if duration_s is not None:
+                if duration_s <= 0:
+                    self.logger.error("Invalid PTZ move duration: %s", duration_s)
                     return False
-                profile_token = profiles[0].token
+                timeout = datetime.timedelta(seconds=duration_s)
             
             # Create continuous move request
-            request = self.ptz_service.create_type('ContinuousMove')
+            request = self._request_template(self.ptz_service, 'ContinuousMove')
             request.ProfileToken = profile_token
             request.Velocity = {
                 'PanTilt': {'x': pan, 'y': tilt},
                 'Zoom': {'x': zoom}
             }
+            request.Timeout = timeout
             
             self.ptz_service.ContinuousMove(request)
-            self.logger.info(f"PTZ moved: pan={pan}, tilt={tilt}, zoom={zoom}")
+            self.logger.info("PTZ moved: pan=%s, tilt=%s, zoom=%s", pan, tilt, zoom)
             return True
             
         except Fault as e:
-            self.logger.error(f"SOAP Fault while moving PTZ: {e}")
+            self.logger.error("SOAP Fault while moving PTZ: %s", e)
             return False
         except Exception as e:
-            self.logger.error(f"Error moving PTZ: {e}")
+            self.logger.error("Error moving PTZ: %s", e)
             return False
     
     def stop_ptz(self, profile_token: Optional[str] = None) -> bool:
@@ -271,16 +580,14 @@ class ONVIFClient:
                 self.logger.error("PTZ service not available")
                 return False
             
-            # If no profile token provided, get the first profile
-            if profile_token is None:
-                profiles = self.get_profiles()
-                if not profiles:
-                    self.logger.error("No profiles available")
-                    return False
-                profile_token = profiles[0].token
+            # If no profile token provided, use the first (cached) profile
+            profile_token = profile_token or self._default_profile_token()
+            if not profile_token:
+                self.logger.error("No profiles available")
+                return False
             
             # Stop PTZ
-            request = self.ptz_service.create_type('Stop')
+            request = self._request_template(self.ptz_service, 'Stop')
             request.ProfileToken = profile_token
             request.PanTilt = True
             request.Zoom = True
@@ -290,12 +597,13 @@ class ONVIFClient:
             return True
             
         except Fault as e:
-            self.logger.error(f"SOAP Fault while stopping PTZ: {e}")
+            self.logger.error("SOAP Fault while stopping PTZ: %s", e)
             return False
         except Exception as e:
-            self.logger.error(f"Error stopping PTZ: {e}")
+            self.logger.error("Error stopping PTZ: %s", e)
             return False
     
+    @_once
     def get_capabilities(self) -> Optional[Dict[str, Any]]:
         """
         Get device capabilities
@@ -310,24 +618,60 @@ class ONVIFClient:
             
             capabilities = self.device_service.GetCapabilities()
             
-            caps_dict = {
-                'Analytics': capabilities.Analytics is not None,
-                'Device': capabilities.Device is not None,
-                'Events': capabilities.Events is not None,
-                'Imaging': capabilities.Imaging is not None,
-                'Media': capabilities.Media is not None,
-                'PTZ': capabilities.PTZ is not None
-            }
+            caps_dict = {f: getattr(capabilities, f, None) is not None for f in _CAP_FIELDS}
             
-            self.logger.info(f"Device capabilities retrieved: {caps_dict}")
+            self.logger.info("Device capabilities retrieved: %s", caps_dict)
             return caps_dict
             
         except Fault as e:
-            self.logger.error(f"SOAP Fault while getting capabilities: {e}")
+            self.logger.error("SOAP Fault while getting capabilities: %s", e)
             return None
         except Exception as e:
-            self.logger.error(f"Error getting capabilities: {e}")
+            self.logger.error("Error getting capabilities: %s", e)
             return None
+    
+    def get_services_capabilities(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Get all service endpoints and their capabilities in one request
+        
+        Returns:
+            dict: Service info keyed by namespace, each with 'XAddr' and
+                  'Capabilities' entries
+        """
+        try:
+            if not self.device_service:
+                self.logger.error("Device service not initialized")
+                return None
+            
+            services = self.device_service.GetServices({'IncludeCapability': True})
+            
+            services_dict = {
+                service.Namespace: {
+                    'XAddr': service.XAddr,
+                    'Capabilities': service.Capabilities
+                }
+                for service in services
+            }
+            
+            self.logger.info("Retrieved %s device services", len(services_dict))
+            return services_dict
+            
+        except Fault as e:
+            self.logger.error("SOAP Fault while getting services: %s", e)
+            return None
+        except Exception as e:
+            self.logger.error("Error getting services: %s", e)
+            return None
+
+
+def close_shared_transport():
+    """
+    Close the HTTP session shared by all ONVIFClient instances
+    
+    Call this at process shutdown; clients that connect afterwards get a
+    fresh session.
+    """
+    _SharedTransport.close()
 
 
 def setup_logging(level=logging.INFO):
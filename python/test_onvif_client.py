@@ -6,7 +6,7 @@ These are basic tests to validate the structure and imports
 
 import sys
 import unittest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 
 
 class TestONVIFClientStructure(unittest.TestCase):
@@ -41,57 +41,240 @@ class TestONVIFClientStructure(unittest.TestCase):
         self.assertEqual(client.username, 'admin')
         self.assertEqual(client.password, 'password')
     
-    def test_methods_exist(self):
-        """Test that all required methods exist"""
+    def test_instances_have_no_dict(self):
+        """Test that ONVIFClient uses __slots__ instead of a per-instance dict"""
         from onvif_client import ONVIFClient
         
         client = ONVIFClient('192.168.1.100', 80, 'admin', 'password')
-        
-        # Check that methods exist
-        self.assertTrue(hasattr(client, 'connect'))
-        self.assertTrue(hasattr(client, 'get_device_information'))
-        self.assertTrue(hasattr(client, 'get_profiles'))
-        self.assertTrue(hasattr(client, 'get_stream_uri'))
-        self.assertTrue(hasattr(client, 'get_snapshot_uri'))
-        self.assertTrue(hasattr(client, 'move_ptz'))
-        self.assertTrue(hasattr(client, 'stop_ptz'))
-        self.assertTrue(hasattr(client, 'get_capabilities'))
-    
-    def test_methods_are_callable(self):
-        """Test that all methods are callable"""
+        self.assertFalse(hasattr(client, '__dict__'))
+    
+    def test_methods_exist(self):
+        """Test that all required methods exist and are callable"""
         from onvif_client import ONVIFClient
         
         client = ONVIFClient('192.168.1.100', 80, 'admin', 'password')
         
-        self.assertTrue(callable(client.connect))
-        self.assertTrue(callable(client.get_device_information))
-        self.assertTrue(callable(client.get_profiles))
-        self.assertTrue(callable(client.get_stream_uri))
-        self.assertTrue(callable(client.get_snapshot_uri))
-        self.assertTrue(callable(client.move_ptz))
-        self.assertTrue(callable(client.stop_ptz))
-        self.assertTrue(callable(client.get_capabilities))
+        expected = {'connect', 'get_device_information', 'get_profiles', 'get_stream_uri',
+                    'get_snapshot_uri', 'move_ptz', 'stop_ptz', 'get_capabilities'}
+        missing = expected - {m for m in dir(client) if callable(getattr(client, m, None))}
+        self.assertFalse(missing, f"Missing methods: {missing}")
+    
+    def test_import_defers_soap_dependencies(self):
+        """Test that importing the module does not load onvif/zeep"""
+        import os
+        import subprocess
+        
+        code = "import sys, onvif_client; sys.exit('zeep' in sys.modules or 'onvif' in sys.modules)"
+        result = subprocess.run([sys.executable, '-c', code],
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(result.returncode, 0)
     
+    @patch('onvif_client.SqliteCache')
     @patch('onvif_client.ONVIFCamera')
-    def test_connect_creates_services(self, mock_onvif_camera):
+    def test_connect_creates_services(self, mock_onvif_camera, mock_sqlite_cache):
         """Test that connect initializes the required services"""
+        import onvif_client
         from onvif_client import ONVIFClient
         
         # Setup mock
         mock_camera_instance = MagicMock()
         mock_onvif_camera.return_value = mock_camera_instance
         
+        # The shared transport must not outlive the mocks
+        self.addCleanup(onvif_client.close_shared_transport)
+        
         # Create client and connect
         client = ONVIFClient('192.168.1.100', 80, 'admin', 'password')
         result = client.connect()
         
         # Verify connection was attempted
-        mock_onvif_camera.assert_called_once_with('192.168.1.100', 80, 'admin', 'password')
+        mock_onvif_camera.assert_called_once()
+        args, kwargs = mock_onvif_camera.call_args
+        self.assertEqual(args, ('192.168.1.100', 80, 'admin', 'password'))
+        self.assertIs(kwargs['transport'], onvif_client._SharedTransport.get())
         self.assertTrue(result)
         
-        # Verify services were created
-        mock_camera_instance.create_devicemgmt_service.assert_called_once()
+        # Verify services are only created on first use, and the device
+        # service built by ONVIFCamera is reused rather than re-created
+        mock_camera_instance.create_media_service.assert_not_called()
+        self.assertIs(client.device_service, mock_camera_instance.devicemgmt)
+        self.assertIs(client.media_service,
+                      mock_camera_instance.create_media_service.return_value)
+        client.media_service
+        mock_camera_instance.create_devicemgmt_service.assert_not_called()
         mock_camera_instance.create_media_service.assert_called_once()
+        
+        # PTZ service is skipped when the device does not advertise it
+        self.assertIsNone(client.ptz_service)
+        self.assertIsNone(client.ptz_service)
+        mock_camera_instance.create_ptz_service.assert_not_called()
+        
+        # All clients reuse the same transport
+        other = ONVIFClient('192.168.1.101', 80, 'admin', 'password')
+        other.connect()
+        self.assertIs(mock_onvif_camera.call_args.kwargs['transport'], kwargs['transport'])
+        
+        # Closing disconnects only that client
+        client.close()
+        self.assertIsNone(client.camera)
+        self.assertIsNone(client.device_service)
+        self.assertIsNone(client.media_service)
+        self.assertFalse(client.get_stream_uri())
+        self.assertIsNotNone(other.device_service)
+        
+        # Closing the shared transport resets it for the next connect
+        onvif_client.close_shared_transport()
+        self.assertIsNone(onvif_client._SharedTransport._transport)
+    
+    def test_default_profile_token_is_cached(self):
+        """Test that GetProfiles is only requested once for default tokens"""
+        from onvif_client import ONVIFClient
+    
+        client = ONVIFClient('192.168.1.100', 80, 'admin', 'password')
+        client.media_service = MagicMock()
+        client.media_service.GetProfiles.return_value = [Mock(token='profile_1')]
+    
+        client.get_stream_uri()
+        client.get_snapshot_uri()
+        client.media_service.GetProfiles.assert_called_once()
+    
+        # Invalidation forces a fresh GetProfiles request
+        client.invalidate_profiles()
+        client.get_stream_uri()
+        self.assertEqual(client.media_service.GetProfiles.call_count, 2)
+    
+    def test_request_templates_are_reused(self):
+        """Test that PTZ request types are only created once"""
+        from onvif_client import ONVIFClient
+        
+        client = ONVIFClient('192.168.1.100', 80, 'admin', 'password')
+        client.ptz_service = MagicMock()
+        
+        for _ in range(3):
+            self.assertTrue(client.move_ptz(0.5, 0.0, 0.0, profile_token='profile_1'))
+        self.assertTrue(client.stop_ptz(profile_token='profile_1'))
+        
+        create_type = client.ptz_service.create_type
+        self.assertEqual(create_type.call_count, 2)
+        self.assertEqual(client.ptz_service.ContinuousMove.call_count, 3)
+    
+    def test_timed_ptz_move_sets_timeout(self):
+        """Test that duration_s becomes a Timeout duration on the request"""
+        import datetime
+        from onvif_client import ONVIFClient
+        
+        client = ONVIFClient('192.168.1.100', 80, 'admin', 'password')
+        client.ptz_service = MagicMock()
+        
+        self.assertTrue(client.move_ptz(0.5, 0.0, 0.0, profile_token='profile_1', duration_s=2.0))
+        request = client.ptz_service.ContinuousMove.call_args.args[0]
+        self.assertEqual(request.Timeout, datetime.timedelta(seconds=2))
+        
+        # Tiny durations must not fall back to float repr (e.g. 1e-05)
+        self.assertTrue(client.move_ptz(0.5, 0.0, 0.0, profile_token='profile_1',
+                                        duration_s=0.00001))
+        self.assertEqual(request.Timeout, datetime.timedelta(microseconds=10))
+        
+        # Non-positive durations are rejected without sending a request
+        self.assertFalse(client.move_ptz(0.5, 0.0, 0.0, profile_token='profile_1', duration_s=0))
+        self.assertFalse(client.move_ptz(0.5, 0.0, 0.0, profile_token='profile_1', duration_s=-2.0))
+        self.assertEqual(client.ptz_service.ContinuousMove.call_count, 2)
+        
+        # The reused request must not keep the previous timeout
+        self.assertTrue(client.move_ptz(0.5, 0.0, 0.0, profile_token='profile_1'))
+        self.assertIsNone(request.Timeout)
+    
+    def test_device_metadata_is_cached(self):
+        """Test that device info and capabilities are fetched once until refresh"""
+        from onvif_client import ONVIFClient
+        
+        client = ONVIFClient('192.168.1.100', 80, 'admin', 'password')
+        client.device_service = MagicMock()
+        
+        info = client.get_device_information()
+        self.assertEqual(info, client.get_device_information())
+        
+        # Callers get a copy, so mutating it does not touch the cache
+        info['Model'] = 'changed'
+        self.assertNotEqual(client.get_device_information()['Model'], 'changed')
+        client.get_capabilities()
+        client.get_capabilities()
+        client.device_service.GetDeviceInformation.assert_called_once()
+        client.device_service.GetCapabilities.assert_called_once()
+        
+        client.refresh()
+        client.get_capabilities()
+        self.assertEqual(client.device_service.GetCapabilities.call_count, 2)
+    
+    def test_get_services_capabilities(self):
+        """Test that service endpoints are keyed by namespace"""
+        from onvif_client import ONVIFClient
+        
+        client = ONVIFClient('192.168.1.100', 80, 'admin', 'password')
+        client.device_service = MagicMock()
+        client.device_service.GetServices.return_value = [
+            Mock(Namespace='http://www.onvif.org/ver10/media/wsdl',
+                 XAddr='http://camera/onvif/media', Capabilities=None)
+        ]
+        
+        services = client.get_services_capabilities()
+        
+        client.device_service.GetServices.assert_called_once_with({'IncludeCapability': True})
+        self.assertEqual(services['http://www.onvif.org/ver10/media/wsdl']['XAddr'],
+                         'http://camera/onvif/media')
+    
+    def test_bootstrap_collects_metadata(self):
+        """Test that bootstrap gathers all metadata results"""
+        from onvif_client import ONVIFClient
+        
+        client = ONVIFClient('192.168.1.100', 80, 'admin', 'password')
+        client.device_service = MagicMock()
+        client.media_service = MagicMock()
+        client.media_service.GetProfiles.return_value = [Mock(token='profile_1')]
+        client.media_service.GetStreamUri.return_value = Mock(Uri='rtsp://camera/stream')
+        client.media_service.GetSnapshotUri.return_value = Mock(Uri='http://camera/snap')
+        
+        results = client.bootstrap()
+        
+        self.assertEqual(set(results), {'device_information', 'capabilities', 'profiles',
+                                        'stream_uri', 'snapshot_uri'})
+        self.assertEqual(results['stream_uri'], 'rtsp://camera/stream')
+        self.assertEqual(results['snapshot_uri'], 'http://camera/snap')
+        client.media_service.GetProfiles.assert_called_once()
+    
+    def test_bootstrap_does_not_overlap_calls_on_one_service(self):
+        """Test that bootstrap never runs two calls on the same service at once"""
+        import threading
+        import time
+        from onvif_client import ONVIFClient
+        
+        lock = threading.Lock()
+        active = {'device': 0, 'media': 0}
+        peak = {'device': 0, 'media': 0}
+        
+        def tracked(service, result):
+            def call(*args, **kwargs):
+                with lock:
+                    active[service] += 1
+                    peak[service] = max(peak[service], active[service])
+                time.sleep(0.02)
+                with lock:
+                    active[service] -= 1
+                return result
+            return call
+        
+        client = ONVIFClient('192.168.1.100', 80, 'admin', 'password')
+        client.device_service = MagicMock()
+        client.device_service.GetDeviceInformation.side_effect = tracked('device', MagicMock())
+        client.device_service.GetCapabilities.side_effect = tracked('device', MagicMock())
+        client.media_service = MagicMock()
+        client.media_service.GetProfiles.side_effect = tracked('media', [Mock(token='profile_1')])
+        client.media_service.GetStreamUri.side_effect = tracked('media', Mock(Uri='rtsp://camera'))
+        client.media_service.GetSnapshotUri.side_effect = tracked('media', Mock(Uri='http://camera'))
+        
+        client.bootstrap()
+        
+        self.assertEqual(peak, {'device': 1, 'media': 1})
     
     def test_setup_logging_function(self):
         """Test that setup_logging function exists and is callable"""
@@ -106,6 +289,75 @@ class TestONVIFClientStructure(unittest.TestCase):
             self.fail(f"setup_logging() raised an exception: {e}")
 
 
+class TestAsyncONVIFClient(unittest.TestCase):
+    """Test the asynchronous ONVIF client"""
+    
+    def test_bootstrap_collects_metadata(self):
+        """Test that async bootstrap gathers all metadata results"""
+        import asyncio
+        from async_onvif_client import AsyncONVIFClient
+        
+        client = AsyncONVIFClient('192.168.1.100', 80, 'admin', 'password')
+        client.device_service = AsyncMock()
+        client.media_service = AsyncMock()
+        client.media_service.GetProfiles.return_value = [Mock(token='profile_1')]
+        client.media_service.GetStreamUri.return_value = Mock(Uri='rtsp://camera/stream')
+        client.media_service.GetSnapshotUri.return_value = Mock(Uri='http://camera/snap')
+        
+        results = asyncio.run(client.bootstrap())
+        
+        self.assertEqual(results['stream_uri'], 'rtsp://camera/stream')
+        self.assertEqual(results['snapshot_uri'], 'http://camera/snap')
+        self.assertIsNotNone(results['device_information'])
+        self.assertIsNotNone(results['capabilities'])
+    
+    def test_bootstrap_many_skips_unreachable_cameras(self):
+        """Test that bootstrap_many returns None for failed connections"""
+        import asyncio
+        import async_onvif_client
+        
+        transports = []
+        
+        async def fake_connect(client):
+            transports.append(client._transport)
+            return False
+        
+        with patch.object(async_onvif_client.AsyncONVIFClient, 'connect', fake_connect):
+            results = asyncio.run(async_onvif_client.bootstrap_many([
+                ('192.168.1.100', 80, 'admin', 'password'),
+                ('192.168.1.101', 80, 'admin', 'password')
+            ]))
+        
+        self.assertEqual(results, [None, None])
+        
+        # All cameras share one transport
+        self.assertIsNotNone(transports[0])
+        self.assertIs(transports[0], transports[1])
+    
+    def test_wsdl_is_parsed_once_per_process(self):
+        """Test that clients share the parsed WSDL and only create proxies"""
+        import asyncio
+        from async_onvif_client import AsyncONVIFClient
+        
+        async def create_media_services():
+            services = []
+            for host in ('192.168.1.100', '192.168.1.101'):
+                client = AsyncONVIFClient(host, 80, 'admin', 'password')
+                services.append(await client._create_service('media', 'http://%s/media' % host))
+            return services
+        
+        first, second = asyncio.run(create_media_services())
+        
+        self.assertIs(first._client.wsdl, second._client.wsdl)
+        
+        # Parsing is as lenient as onvif-zeep's own services
+        for settings in (first._client.settings, first._client.wsdl.settings):
+            self.assertFalse(settings.strict)
+            self.assertTrue(settings.xml_huge_tree)
+        self.assertIsNot(first._client, second._client)
+        self.assertEqual(first._binding_options['address'], 'http://192.168.1.100/media')
+
+
 class TestExampleScript(unittest.TestCase):
     """Test that the example script is properly structured"""
     
@@ -122,6 +374,20 @@ class TestExampleScript(unittest.TestCase):
         import example
         self.assertTrue(hasattr(example, 'main'))
         self.assertTrue(callable(example.main))
+    
+    def test_load_config_is_cached_until_reload(self):
+        """Test that configuration is only re-read after reload_config"""
+        import example
+        
+        example.reload_config()
+        with patch.dict('os.environ', {'ONVIF_HOST': '10.0.0.1'}), \
+                patch('example.os.path.exists', return_value=False):
+            self.assertEqual(example.load_config()['host'], '10.0.0.1')
+            with patch.dict('os.environ', {'ONVIF_HOST': '10.0.0.2'}):
+                self.assertEqual(example.load_config()['host'], '10.0.0.1')
+                example.reload_config()
+                self.assertEqual(example.load_config()['host'], '10.0.0.2')
+        example.reload_config()
 
 
 if __name__ == '__main__':
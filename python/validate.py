@@ -8,13 +8,51 @@ import sys
 from onvif_client import ONVIFClient, setup_logging
 
 
+# Public methods every ONVIFClient must provide
+_METHODS = frozenset((
+    'connect',
+    'get_device_information',
+    'get_profiles',
+    'get_stream_uri',
+    'get_snapshot_uri',
+    'move_ptz',
+    'stop_ptz',
+    'get_capabilities'
+))
+_METHODS_COUNT = len(_METHODS)
+
+# Output blocks, each written with a single sys.stdout.write()
+_HEADER = (
+    "=" * 60 + "\n"
+    "ONVIF Client API Validation\n"
+    + "=" * 60 + "\n"
+    "\n"
+)
+_SUMMARY = (
+    "\n"
+    + "=" * 60 + "\n"
+    "✓ All API validations passed!\n"
+    + "=" * 60 + "\n"
+    "\n"
+    "Summary:\n"
+    "  - ONVIFClient class: OK\n"
+    "  - Client initialization: OK\n"
+    "  - Public methods: {count} methods OK\n"
+    "  - Logging setup: OK\n"
+    "\n"
+    "The ONVIF client is ready to use!\n"
+    "\n"
+    "Next steps:\n"
+    "  1. Configure your camera credentials in config.ini\n"
+    "  2. Run: python example.py\n"
+    "  3. Or use the client in your own Python scripts\n"
+)
+
+
 def validate_api():
     """Validate the ONVIF client API"""
     
-    print("=" * 60)
-    print("ONVIF Client API Validation")
-    print("=" * 60)
-    print()
+    sys.stdout.write(_HEADER)
     
     # Create a client instance (no connection required for this test)
     print("✓ Creating ONVIFClient instance...")
@@ -29,44 +67,22 @@ def validate_api():
     
     # Validate methods exist
     print("✓ Validating client methods...")
-    methods = [
-        'connect',
-        'get_device_information',
-        'get_profiles',
-        'get_stream_uri',
-        'get_snapshot_uri',
-        'move_ptz',
-        'stop_ptz',
-        'get_capabilities'
-    ]
     
-    for method in methods:
-        assert hasattr(client, method), f"Missing method: {method}"
-        assert callable(getattr(client, method)), f"Method not callable: {method}"
+    # Look methods up in the class dict directly instead of resolving each
+    # name through the instance with hasattr()/getattr()
+    cls_dict = ONVIFClient.__dict__
+    _callable = callable
+    for method in _METHODS:
+        assert method in cls_dict, f"Missing method: {method}"
+        assert _callable(cls_dict[method]), f"Method not callable: {method}"
     
-    print(f"  - All {len(methods)} methods present and callable")
+    print(f"  - All {_METHODS_COUNT} methods present and callable")
     
     # Validate logging function
     print("✓ Validating setup_logging function...")
     setup_logging()
     
-    print()
-    print("=" * 60)
-    print("✓ All API validations passed!")
-    print("=" * 60)
-    print()
-    print("Summary:")
-    print("  - ONVIFClient class: OK")
-    print("  - Client initialization: OK")
-    print(f"  - Public methods: {len(methods)} methods OK")
-    print("  - Logging setup: OK")
-    print()
-    print("The ONVIF client is ready to use!")
-    print()
-    print("Next steps:")
-    print("  1. Configure your camera credentials in config.ini")
-    print("  2. Run: python example.py")
-    print("  3. Or use the client in your own Python scripts")
+    sys.stdout.write(_SUMMARY.format(count=_METHODS_COUNT))
     
     return True
 